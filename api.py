@@ -0,0 +1,186 @@
+"""
+Headless HTTP API for the Smart Resume & Cover Letter Generator.
+
+Exposes the same parsing and generation code as the Streamlit UI without the
+script-rerun model, so other systems (e.g. an ATS) can call it directly.
+
+Every endpoint except /health requires an "Authorization: Bearer <token>"
+header matching API_AUTH_TOKEN, since calls are billed to the server's OpenAI
+key without the UI's daily limit.
+
+Run locally next to the UI:
+    uvicorn api:app --host 127.0.0.1 --port 8000 --workers 2
+"""
+
+import json
+import os
+import secrets
+from typing import Optional
+
+import openai
+from dotenv import load_dotenv
+from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
+
+from src.ai_generator import GenerationError, analyze_job_match, enhance_resume_bullets, generate_cover_letter, get_inflight_stats
+from src.resume_parser import extract_text_from_bytes, get_extractor
+from src.utils import calculate_content_stats, validate_inputs
+
+# Load environment variables
+load_dotenv()
+
+app = FastAPI(
+    title="Smart Resume & Cover Letter Generator API",
+    description="Parse resumes and generate tailored application materials."
+)
+
+_bearer = HTTPBearer(auto_error=False)
+
+def require_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)):
+    """Reject requests without the configured bearer token; refuse everything if none is configured"""
+    expected = os.getenv("API_AUTH_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=503, detail="API_AUTH_TOKEN is not configured on the server.")
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid or missing bearer token.", headers={"WWW-Authenticate": "Bearer"})
+
+async def read_resume_upload(resume: UploadFile):
+    """Read an uploaded resume, enforcing the configured size limit, and extract its text"""
+    if get_extractor(resume.filename, resume.content_type) is None:
+        raise HTTPException(status_code=415, detail="Unsupported file type. Upload a PDF or DOCX resume.")
+
+    max_bytes = int(float(os.getenv("MAX_FILE_SIZE_MB", 10)) * 1024 * 1024)
+    file_bytes = await resume.read(max_bytes + 1)
+    if len(file_bytes) > max_bytes:
+        raise HTTPException(status_code=413, detail="Resume file is too large.")
+
+    text = await run_in_threadpool(extract_text_from_bytes, file_bytes, resume.filename, resume.content_type)
+    if not text:
+        raise HTTPException(status_code=422, detail="Could not extract text from the resume. Please check the file format.")
+    return text
+
+async def resolve_resume_text(resume: Optional[UploadFile], resume_text: Optional[str]):
+    """Use the uploaded resume file if present, otherwise the resume text field"""
+    if resume is not None and resume.filename:
+        return await read_resume_upload(resume)
+    if resume_text:
+        return resume_text
+    raise HTTPException(status_code=422, detail="Provide a resume file or resume_text.")
+
+def format_sse(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_events(chunks):
+    """Wrap generated text chunks in server-sent events, ending with a done or error event"""
+    try:
+        for chunk in chunks:
+            yield format_sse("chunk", {"text": chunk})
+    except Exception as e:
+        yield format_sse("error", {"detail": str(e)})
+        return
+    yield format_sse("done", {})
+
+def generation_http_error(error):
+    """
+    Map a generation failure to an HTTP error a client can act on.
+
+    Rate limits become 429 (with Retry-After when OpenAI sends one), an
+    exhausted quota, a missing key or an unreachable API become 503, and any
+    other upstream error becomes 502.
+    """
+    message = str(error)
+    if isinstance(error, openai.RateLimitError):
+        if "quota" in message.lower():
+            return HTTPException(status_code=503, detail=f"OpenAI quota exceeded: {message}")
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+        return HTTPException(status_code=429, detail=message, headers={"Retry-After": retry_after} if retry_after else None)
+    if isinstance(error, openai.AuthenticationError):
+        # The upstream message quotes part of the server's key
+        return HTTPException(status_code=503, detail="OpenAI rejected the server's API key.")
+    if isinstance(error, (GenerationError, openai.APIConnectionError, openai.InternalServerError)):
+        return HTTPException(status_code=503, detail=message)
+    return HTTPException(status_code=502, detail=message)
+
+async def run_generation(generator, resume, resume_text, job_description, stream):
+    """
+    Validate inputs and run a generator from src.ai_generator.
+
+    Args:
+        generator (callable): Generation function taking resume text and job description
+        resume (UploadFile): Optional uploaded resume file
+        resume_text (str): Optional resume text used when no file is uploaded
+        job_description (str): Job posting description
+        stream (bool): Stream the result as server-sent events
+
+    Returns:
+        dict or StreamingResponse: Generated content with model and usage, or an event stream
+    """
+    resume_text = await resolve_resume_text(resume, resume_text)
+    is_valid, error_message = validate_inputs(resume_text, job_description)
+    if not is_valid:
+        raise HTTPException(status_code=422, detail=error_message)
+
+    if stream:
+        try:
+            chunks = await run_in_threadpool(generator, resume_text, job_description, stream=True, raise_errors=True)
+        except Exception as e:
+            raise generation_http_error(e)
+        return StreamingResponse(
+            stream_events(chunks),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    try:
+        return await run_in_threadpool(generator, resume_text, job_description, with_metadata=True, raise_errors=True)
+    except Exception as e:
+        raise generation_http_error(e)
+
+@app.get("/health")
+async def health():
+    """Report service liveness, API key configuration and shared-call counts"""
+    return {
+        "status": "ok",
+        "openai_configured": bool(os.getenv("OPENAI_API_KEY")),
+        "model": os.getenv("DEFAULT_MODEL", "gpt-4o-mini"),
+        "openai_calls": get_inflight_stats()
+    }
+
+@app.post("/parse", dependencies=[Depends(require_token)])
+async def parse_resume(resume: UploadFile = File(...)):
+    """Extract text and basic statistics from an uploaded PDF or DOCX resume"""
+    text = await read_resume_upload(resume)
+    return {"text": text, "stats": calculate_content_stats(text)}
+
+@app.post("/cover-letter", dependencies=[Depends(require_token)])
+async def cover_letter(
+    job_description: str = Form(...),
+    resume: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    stream: bool = Form(False)
+):
+    """Generate a tailored cover letter"""
+    return await run_generation(generate_cover_letter, resume, resume_text, job_description, stream)
+
+@app.post("/bullets", dependencies=[Depends(require_token)])
+async def resume_bullets(
+    job_description: str = Form(...),
+    resume: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    stream: bool = Form(False)
+):
+    """Suggest enhanced resume bullet points for the job"""
+    return await run_generation(enhance_resume_bullets, resume, resume_text, job_description, stream)
+
+@app.post("/match", dependencies=[Depends(require_token)])
+async def job_match(
+    job_description: str = Form(...),
+    resume: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    stream: bool = Form(False)
+):
+    """Analyze how well the resume matches the job description"""
+    return await run_generation(analyze_job_match, resume, resume_text, job_description, stream)
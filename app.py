@@ -1,9 +1,10 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from src.resume_parser import extract_text_from_file
+from src.resume_parser import extract_text_once
+from src.resume_pipeline import cancel_resume_pipeline, get_resume_features, start_resume_pipeline
 from src.ai_generator import generate_cover_letter, enhance_resume_bullets
-from src.utils import display_results
+from src.utils import reset_results_for, show_results, store_result
 
 # Load environment variables
 load_dotenv()
@@ -74,17 +75,24 @@ def main():
     resume_text = ""
     if uploaded_file:
         with st.spinner("📖 Reading your resume..."):
-            resume_text = extract_text_from_file(uploaded_file)
+            resume_text, file_key = extract_text_once(uploaded_file)
+            reset_results_for(file_key)
             
         if resume_text:
+            # Prepare resume features in the background while the job description is entered
+            start_resume_pipeline(st.session_state, file_key, resume_text)
             st.success(f"✅ Resume uploaded successfully! ({len(resume_text)} characters)")
             
             # Show preview in expander
             with st.expander("👀 Preview Resume Content"):
                 st.text_area("Resume Text", resume_text, height=200, disabled=True)
         else:
+            cancel_resume_pipeline(st.session_state)
             st.error("❌ Could not extract text from the resume. Please check the file format.")
             return
+    else:
+        cancel_resume_pipeline(st.session_state)
+        reset_results_for(None)
     
     # Job description input
     st.header("🎯 Job Description")
@@ -104,22 +112,24 @@ def main():
         with col1:
             if st.button("✍️ Generate Cover Letter", type="primary", use_container_width=True):
                 with st.spinner("🤖 Generating your cover letter..."):
-                    cover_letter = generate_cover_letter(resume_text, job_description)
+                    features = get_resume_features(st.session_state)
+                    prompt_resume = features["prompt_resume"] if features else resume_text
+                    cover_letter = generate_cover_letter(prompt_resume, job_description)
                     
                 if cover_letter:
-                    st.header("📝 Generated Cover Letter")
-                    display_results("cover_letter", cover_letter)
+                    store_result("cover_letter", cover_letter)
                 else:
                     st.error("❌ Failed to generate cover letter. Please try again.")
         
         with col2:
             if st.button("📈 Enhance Resume Bullets", type="secondary", use_container_width=True):
                 with st.spinner("🤖 Enhancing your resume..."):
-                    enhanced_bullets = enhance_resume_bullets(resume_text, job_description)
+                    features = get_resume_features(st.session_state)
+                    prompt_resume = features["prompt_resume"] if features else resume_text
+                    enhanced_bullets = enhance_resume_bullets(prompt_resume, job_description)
                     
                 if enhanced_bullets:
-                    st.header("🎯 Enhanced Resume Bullets")
-                    display_results("resume_bullets", enhanced_bullets)
+                    store_result("resume_bullets", enhanced_bullets)
                 else:
                     st.error("❌ Failed to enhance resume bullets. Please try again.")
     
@@ -128,6 +138,9 @@ def main():
     elif not job_description:
         st.info("🎯 Please paste the job description to continue")
     
+    # Results persist in session state; feedback and downloads only rerun their own panel
+    show_results()
+    
     # Footer
     st.markdown("---")
     st.markdown("*Built with ❤️ using Streamlit and OpenAI*")
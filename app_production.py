@@ -2,23 +2,34 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import hashlib
-from src.resume_parser import extract_text_from_file
+import secrets
+import string
+import time
+from src.resume_parser import count_pages, extract_text_once
+from src.resume_pipeline import cancel_resume_pipeline, get_resume_features, start_resume_pipeline
 from src.ai_generator import generate_cover_letter, enhance_resume_bullets
-from src.utils import display_results
+from src.history import get_generation, list_generations, save_generation
+from src.traffic import is_recording, record_event
+from src.utils import reset_results_for, show_results, store_result
 
 # Load environment variables
 load_dotenv()
 
+# Length and characters of secrets.token_urlsafe(32)
+USER_ID_LENGTH = 43
+USER_ID_ALPHABET = frozenset(string.ascii_letters + string.digits + "-_")
+
 # Usage tracking functions
 def get_user_id():
-    """Generate a unique user ID based on session"""
+    """Generate an unguessable user ID for the session, kept in the URL so it survives a refresh"""
     if 'user_id' not in st.session_state:
-        # Create a unique identifier for this session
-        import random
-        import string
-        user_info = f"{datetime.now().timestamp()}-{''.join(random.choices(string.ascii_letters, k=6))}"
-        st.session_state.user_id = hashlib.md5(user_info.encode()).hexdigest()[:10]
+        user_id = st.query_params.get("uid", "")
+        # The ID is the only key to the user's history, so only accept full-length random tokens
+        if not (len(user_id) == USER_ID_LENGTH and all(c in USER_ID_ALPHABET for c in user_id)):
+            user_id = secrets.token_urlsafe(32)
+        st.session_state.user_id = user_id
+    if st.query_params.get("uid") != st.session_state.user_id:
+        st.query_params["uid"] = st.session_state.user_id
     return st.session_state.user_id
 
 def check_usage_limit(user_id, max_requests=10):
@@ -49,6 +60,100 @@ def get_remaining_requests(user_id, max_requests=10):
     used = st.session_state.get(usage_key, 0)
     return max_requests - used
 
+def record_upload(user_id, uploaded_file, file_key, resume_text, parse_seconds):
+    """Record a sanitized upload event once per distinct file when traffic recording is on"""
+    if not is_recording() or st.session_state.get("traffic_file_key") == file_key:
+        return
+    st.session_state.traffic_file_key = file_key
+    record_event(
+        user_id,
+        "upload",
+        file_type="pdf" if uploaded_file.name.lower().endswith(".pdf") else "docx",
+        size_bytes=uploaded_file.size,
+        page_count=count_pages(uploaded_file.getvalue(), uploaded_file.name),
+        chars=len(resume_text or ""),
+        ok=bool(resume_text),
+        duration=parse_seconds
+    )
+
+def record_job_description(user_id, job_description):
+    """Record the job description length whenever it changes"""
+    if not is_recording() or st.session_state.get("traffic_jd_length", 0) == len(job_description):
+        return
+    st.session_state.traffic_jd_length = len(job_description)
+    record_event(user_id, "job_description", length=len(job_description))
+
+def run_generation(user_id, kind, generator, resume_text, job_description):
+    """
+    Generate a new result and save it to the user's history.
+    
+    Args:
+        user_id (str): Identifier returned by get_user_id
+        kind (str): Result type ('cover_letter' or 'resume_bullets')
+        generator (callable): Generation function from src.ai_generator
+        resume_text (str): Resume content
+        job_description (str): Job description
+        
+    Returns:
+        str: Generated content, or None if generation fails
+    """
+    result = generator(resume_text, job_description, with_metadata=True)
+    if not result:
+        return None
+    
+    save_generation(user_id, kind, resume_text, job_description, result)
+    return result["content"]
+
+@st.fragment
+def show_history(user_id):
+    """Display the user's past generations with search, pagination and re-download"""
+    with st.expander("📚 Your Generation History"):
+        query = st.text_input("Search past results", key="history_query", placeholder="e.g. data engineer, Python")
+        page_size = 10
+        page = st.session_state.get("history_page", 1)
+        entries, total = list_generations(user_id, page=page, page_size=page_size, query=query)
+        
+        if not total:
+            st.info("No saved results yet." if not query else "No results match your search.")
+            return
+        
+        page_count = (total + page_size - 1) // page_size
+        if page > page_count:
+            st.session_state.history_page = page = page_count
+            entries, total = list_generations(user_id, page=page, page_size=page_size, query=query)
+        st.number_input("Page", min_value=1, max_value=page_count, key="history_page")
+        st.caption(f"{total} saved results")
+        
+        labels = {
+            "cover_letter": "✍️ Cover Letter",
+            "resume_bullets": "📈 Resume Bullets"
+        }
+        selected_id = st.radio(
+            "Saved results",
+            [entry["id"] for entry in entries],
+            format_func=lambda entry_id: next(
+                f"{labels.get(entry['kind'], entry['kind'])} · "
+                f"{datetime.fromtimestamp(entry['created_at']).strftime('%Y-%m-%d %H:%M')} · "
+                f"{entry['model']} · {entry['total_tokens']} tokens"
+                for entry in entries if entry["id"] == entry_id
+            ),
+            # Search matches come back highlighted, showing why each entry was found
+            captions=[" ".join((entry["preview"] or "").split()) for entry in entries],
+        )
+        
+        entry = get_generation(user_id, selected_id) if selected_id else None
+        if entry:
+            st.text_area("Saved Result", entry["content"], height=300, disabled=True)
+            if st.download_button(
+                label="📥 Download Again",
+                data=entry["content"],
+                file_name=f"{entry['kind']}_{entry['id']}.txt",
+                mime="text/plain",
+                key="history_download",
+                use_container_width=True
+            ):
+                record_event(user_id, "click", button="history_download")
+
 def main():
     """Main Streamlit application - Production version with API key options and usage limits"""
     
@@ -67,6 +172,9 @@ def main():
     # Get user ID for tracking
     user_id = get_user_id()
     remaining_requests = get_remaining_requests(user_id)
+    if is_recording() and "traffic_session_started" not in st.session_state:
+        st.session_state.traffic_session_started = True
+        record_event(user_id, "session_start")
     
     # Sidebar for API key selection and configuration
     with st.sidebar:
@@ -151,6 +259,7 @@ def main():
         - ⏰ **Wait until tomorrow** for fresh requests
         - 💰 **Costs only ~$0.01-0.02 per request** with your own key
         """)
+        show_history(user_id)
         return
     # File upload section
     st.header("📄 Upload Your Resume")
@@ -164,17 +273,26 @@ def main():
     resume_text = ""
     if uploaded_file:
         with st.spinner("📖 Reading your resume..."):
-            resume_text = extract_text_from_file(uploaded_file)
+            parse_started = time.perf_counter()
+            resume_text, file_key = extract_text_once(uploaded_file)
+            reset_results_for(file_key)
+            record_upload(user_id, uploaded_file, file_key, resume_text, time.perf_counter() - parse_started)
             
         if resume_text:
+            # Prepare resume features in the background while the job description is entered
+            start_resume_pipeline(st.session_state, file_key, resume_text)
             st.success(f"✅ Resume uploaded successfully! ({len(resume_text)} characters)")
             
             # Show preview in expander
             with st.expander("👀 Preview Resume Content"):
                 st.text_area("Resume Text", resume_text, height=200, disabled=True)
         else:
+            cancel_resume_pipeline(st.session_state)
             st.error("❌ Could not extract text from the resume. Please check the file format.")
             return
+    else:
+        cancel_resume_pipeline(st.session_state)
+        reset_results_for(None)
     
     # Job description input
     st.header("🎯 Job Description")
@@ -184,6 +302,7 @@ def main():
         placeholder="Copy and paste the job posting you're applying for...",
         help="Include the full job description for best results"
     )
+    record_job_description(user_id, job_description)
     
     # Generation options
     if resume_text and job_description:
@@ -195,12 +314,23 @@ def main():
             if st.button("✍️ Generate Cover Letter", type="primary", use_container_width=True):
                 # Check usage limit for free service
                 if not using_own_key and not check_usage_limit(user_id):
+                    record_event(user_id, "click", button="cover_letter", outcome="limit")
                     st.error("🚫 Daily limit reached! Please use your own API key or wait until tomorrow.")
                     return
                 
+                click_started = time.perf_counter()
                 with st.spinner("🤖 Generating your cover letter..."):
-                    cover_letter = generate_cover_letter(resume_text, job_description)
+                    features = get_resume_features(st.session_state)
+                    prompt_resume = features["prompt_resume"] if features else resume_text
+                    cover_letter = run_generation(
+                        user_id, "cover_letter", generate_cover_letter, prompt_resume, job_description
+                    )
                     
+                record_event(
+                    user_id, "click", button="cover_letter",
+                    outcome="generated" if cover_letter else "failed",
+                    duration=time.perf_counter() - click_started
+                )
                 if cover_letter:
                     # Increment usage for free service
                     if not using_own_key:
@@ -208,8 +338,7 @@ def main():
                         remaining = get_remaining_requests(user_id)
                         st.sidebar.info(f"🎯 {remaining} requests remaining today")
                     
-                    st.header("📝 Generated Cover Letter")
-                    display_results("cover_letter", cover_letter)
+                    store_result("cover_letter", cover_letter)
                 else:
                     st.error("❌ Failed to generate cover letter. Please try again.")
         
@@ -217,12 +346,23 @@ def main():
             if st.button("📈 Enhance Resume Bullets", type="secondary", use_container_width=True):
                 # Check usage limit for free service
                 if not using_own_key and not check_usage_limit(user_id):
+                    record_event(user_id, "click", button="resume_bullets", outcome="limit")
                     st.error("🚫 Daily limit reached! Please use your own API key or wait until tomorrow.")
                     return
                 
+                click_started = time.perf_counter()
                 with st.spinner("🤖 Enhancing your resume..."):
-                    enhanced_bullets = enhance_resume_bullets(resume_text, job_description)
+                    features = get_resume_features(st.session_state)
+                    prompt_resume = features["prompt_resume"] if features else resume_text
+                    enhanced_bullets = run_generation(
+                        user_id, "resume_bullets", enhance_resume_bullets, prompt_resume, job_description
+                    )
                     
+                record_event(
+                    user_id, "click", button="resume_bullets",
+                    outcome="generated" if enhanced_bullets else "failed",
+                    duration=time.perf_counter() - click_started
+                )
                 if enhanced_bullets:
                     # Increment usage for free service
                     if not using_own_key:
@@ -230,8 +370,7 @@ def main():
                         remaining = get_remaining_requests(user_id)
                         st.sidebar.info(f"🎯 {remaining} requests remaining today")
                     
-                    st.header("🎯 Enhanced Resume Bullets")
-                    display_results("resume_bullets", enhanced_bullets)
+                    store_result("resume_bullets", enhanced_bullets)
                 else:
                     st.error("❌ Failed to enhance resume bullets. Please try again.")
     
@@ -240,6 +379,11 @@ def main():
     elif not job_description:
         st.info("🎯 Please paste the job description to continue")
     
+    # Results persist in session state; feedback and downloads only rerun their own panel
+    show_results()
+    
+    show_history(user_id)
+    
     # Footer
     st.markdown("---")
     st.markdown("*Built with ❤️ using Streamlit and OpenAI*")
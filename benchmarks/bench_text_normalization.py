@@ -0,0 +1,74 @@
+"""
+Benchmark resume text normalization against document size.
+
+Builds synthetic multi-page resumes containing running headers and footers,
+ligatures, soft hyphens and broken line wraps, then times normalize_pages as
+the page count doubles. Time per character should stay flat if the pipeline
+is linear.
+
+Usage:
+    python benchmarks/bench_text_normalization.py [--max-pages 2048] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_normalizer import normalize_pages
+
+PAGE_BODY = [
+    "Senior Software Engineer, Example Corp",
+    "Led a team of \ufb01ve engineers to re-",
+    "design the payments platform, reducing",
+    "latency by 40% across all regions.",
+    "Built data pipelines processing 2TB/day with Python, Spark and Air\ufb02ow.",
+    "",
+    "Mentored junior engineers and ran weekly archi\u00adtecture reviews.",
+    "Skills: Python, Go, SQL, Kubernetes, AWS, Terraform",
+]
+
+def make_pages(count):
+    """Build synthetic page texts with a running header and footer"""
+    pages = []
+    for number in range(1, count + 1):
+        lines = ["Jane Doe - Resume"] + PAGE_BODY * 6 + [f"Page {number} of {count}"]
+        pages.append("\n".join(lines))
+    return pages
+
+def time_normalization(pages, repeat):
+    """Return the best wall time over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in normalize_pages(iter(pages)):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-pages", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>8} {'chars':>12} {'seconds':>10} {'ns/char':>9}")
+    baseline = None
+    pages = 1
+    while pages <= args.max_pages:
+        page_texts = make_pages(pages)
+        chars = sum(len(text) for text in page_texts)
+        seconds = time_normalization(page_texts, args.repeat)
+        ns_per_char = seconds * 1e9 / chars
+        baseline = baseline or ns_per_char
+        print(f"{pages:>8} {chars:>12} {seconds:>10.4f} {ns_per_char:>9.1f}")
+        largest = pages
+        pages *= 2
+
+    print(f"\nns/char at {largest} pages is {ns_per_char / baseline:.2f}x the single-page cost "
+          "(~1x means linear scaling)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Replay recorded session traces against the parse and generation code paths.
+
+Traces come from app_production.py with TRAFFIC_RECORD_PATH set (see
+src/traffic.py). Each session is replayed on its own thread with its recorded
+arrival offset and think times divided by --speed. Recorded think times run
+from the end of one action to the start of the next, so the replayed
+operations add their own latency exactly once. Feedback and download clicks
+only contribute their think time. Uploads are re-created as
+synthetic PDF/DOCX files with the recorded size and page count and parsed with
+extract_text_from_bytes; generate clicks call the real generators, which talk
+to a local stand-in LLM server instead of OpenAI.
+
+Reports throughput, latency percentiles and error rates per operation, plus
+process memory per concurrent session, for sizing worker processes.
+
+Usage:
+    python benchmarks/replay_traffic.py traces.jsonl --speed 10
+    python benchmarks/replay_traffic.py --sample 50 --speed 20 --llm-latency-ms 800
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "python data platform engineer led team built scalable services reduced latency improved "
+    "reliability designed pipelines deployed kubernetes aws customers revenue analytics growth "
+    "mentored delivered migrated automated testing product stakeholders roadmap"
+).split()
+
+class StandInLLM(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions endpoint with configurable latency and failures"""
+
+    latency = 1.0
+    jitter = 0.3
+    error_rate = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+
+        if random.random() < self.error_rate:
+            self._send(500, {"error": {"message": "stand-in failure", "type": "server_error"}})
+            return
+
+        prompt_tokens = sum(len(message.get("content", "")) for message in body.get("messages", [])) // 4
+        completion_tokens = min(int(body.get("max_tokens") or 800), 400)
+        content = " ".join(random.choice(WORDS) for _ in range(completion_tokens))
+        self._send(200, {
+            "id": "chatcmpl-replay",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stand_in_llm(latency_ms, jitter_ms, error_rate):
+    """Start the stand-in LLM on a free local port and return its base URL"""
+    StandInLLM.latency = latency_ms / 1000
+    StandInLLM.jitter = jitter_ms / 1000
+    StandInLLM.error_rate = error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInLLM)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def synthetic_lines(chars, seed):
+    """Produce resume-like lines totalling roughly the requested number of characters"""
+    rng = random.Random(seed)
+    lines = [f"Candidate {seed}"]
+    total = len(lines[0])
+    while total < chars:
+        line = " ".join(rng.choice(WORDS) for _ in range(10)).capitalize() + "."
+        lines.append(line)
+        total += len(line) + 1
+    return lines
+
+def make_pdf(lines, page_count):
+    """Build an uncompressed text PDF spreading the lines over page_count pages"""
+    page_count = max(1, page_count)
+    per_page = max(1, -(-len(lines) // page_count))
+    pages = [lines[i:i + per_page] for i in range(0, per_page * page_count, per_page)]
+
+    font_id = 3 + 2 * page_count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(page_count))}] /Count {page_count} >>".encode()
+    ]
+    for index, page_lines in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * index} 0 R >>".encode()
+        )
+        operations = ["BT /F1 10 Tf 12 TL 40 760 Td"] + [f"({line}) Tj T*" for line in page_lines] + ["ET"]
+        stream = "\n".join(operations).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return output
+
+def make_docx(lines):
+    """Build a DOCX with one paragraph per line"""
+    from docx import Document
+
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def synthetic_job_description(length, seed):
+    rng = random.Random(f"jd-{seed}")
+    words = []
+    total = 0
+    while total < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)
+
+def load_sessions(path):
+    """Group trace events by session, ordered by time"""
+    sessions = defaultdict(list)
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            if line.strip():
+                event = json.loads(line)
+                sessions[event["session"]].append(event)
+    for events in sessions.values():
+        events.sort(key=lambda event: event["ts"])
+    return dict(sessions)
+
+def sample_sessions(count, window, seed=7):
+    """Generate plausible synthetic sessions when no recording is available"""
+    rng = random.Random(seed)
+    sessions = {}
+    for number in range(count):
+        start = rng.uniform(0, window)
+        pdf = rng.random() < 0.7
+        pages = rng.choice([1, 1, 2, 2, 3]) if pdf else None
+        chars = rng.randint(2000, 3500 * (pages or 2))
+        events = [
+            {"event": "session_start", "think_time": 0.0},
+            {"event": "upload", "think_time": rng.uniform(5, 30), "file_type": "pdf" if pdf else "docx",
+             "size_bytes": chars + 1500, "page_count": pages, "chars": chars},
+            {"event": "job_description", "think_time": rng.uniform(10, 60), "length": rng.randint(1200, 5000)},
+            {"event": "click", "think_time": rng.uniform(2, 15), "button": "cover_letter"}
+        ]
+        if rng.random() < 0.5:
+            events.append({"event": "click", "think_time": rng.uniform(20, 90), "button": "resume_bullets"})
+        if rng.random() < 0.3:
+            events.append({"event": "click", "think_time": rng.uniform(5, 30), "button": "cover_letter_feedback_great"})
+        timestamp = start
+        for event in events:
+            timestamp += event["think_time"]
+            event.update(ts=timestamp, session=f"sample{number}")
+        sessions[f"sample{number}"] = events
+    return sessions
+
+class Metrics:
+    """Thread-safe collection of operation latencies, outcomes and memory samples"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = defaultdict(list)
+        self.active_sessions = 0
+        self.peak_sessions = 0
+        self.baseline_rss = current_rss()
+        self.peak_rss = self.baseline_rss
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.operations[name].append((seconds, ok))
+
+    def session_started(self):
+        with self.lock:
+            self.active_sessions += 1
+            self.peak_sessions = max(self.peak_sessions, self.active_sessions)
+
+    def session_finished(self):
+        with self.lock:
+            self.active_sessions -= 1
+
+    def sample_memory(self, stop_event):
+        while not stop_event.wait(0.1):
+            rss = current_rss()
+            with self.lock:
+                self.peak_rss = max(self.peak_rss, rss)
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS outside Linux; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def replay_session(events, start_at, speed, metrics, generators, extract_text_from_bytes):
+    """Drive one session's parse and generation calls with scaled think times"""
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    metrics.session_started()
+    resume_text = None
+    job_description = None
+    try:
+        for event in events:
+            time.sleep(event.get("think_time", 0.0) / speed)
+            kind = event["event"]
+
+            if kind == "upload":
+                lines = synthetic_lines(event.get("chars") or event.get("size_bytes", 4000), event["session"])
+                if event.get("file_type") == "pdf":
+                    file_bytes, file_name = make_pdf(lines, event.get("page_count") or 1), "resume.pdf"
+                else:
+                    file_bytes, file_name = make_docx(lines), "resume.docx"
+                started = time.perf_counter()
+                try:
+                    resume_text = extract_text_from_bytes(file_bytes, file_name)
+                except Exception:
+                    resume_text = None
+                metrics.record("parse", time.perf_counter() - started, bool(resume_text))
+
+            elif kind == "job_description":
+                job_description = synthetic_job_description(event.get("length", 2000), event["session"])
+
+            elif kind == "click" and event.get("button") in generators:
+                if event.get("outcome") == "limit" or not (resume_text and job_description):
+                    continue
+                started = time.perf_counter()
+                try:
+                    result = generators[event["button"]](resume_text, job_description)
+                except Exception:
+                    result = None
+                metrics.record(event["button"], time.perf_counter() - started, bool(result))
+    finally:
+        metrics.session_finished()
+
+def print_report(metrics, wall_seconds, session_count):
+    print(f"\nReplayed {session_count} sessions in {wall_seconds:.1f}s "
+          f"(peak {metrics.peak_sessions} concurrent)\n")
+    print(f"{'operation':<18} {'count':>6} {'ops/s':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    total = 0
+    for name, samples in sorted(metrics.operations.items()):
+        latencies = [seconds * 1000 for seconds, _ in samples]
+        errors = sum(1 for _, ok in samples if not ok)
+        total += len(samples)
+        print(f"{name:<18} {len(samples):>6} {len(samples) / wall_seconds:>7.2f} {errors / len(samples):>6.1%} "
+              f"{percentile(latencies, 0.50):>9.1f} {percentile(latencies, 0.95):>9.1f} "
+              f"{percentile(latencies, 0.99):>9.1f} {max(latencies):>9.1f}")
+    print(f"{'total':<18} {total:>6} {total / wall_seconds:>7.2f}")
+
+    growth = max(0, metrics.peak_rss - metrics.baseline_rss)
+    per_session = growth / max(1, metrics.peak_sessions)
+    print(f"\nRSS baseline {metrics.baseline_rss / 2**20:.1f} MiB, peak {metrics.peak_rss / 2**20:.1f} MiB, "
+          f"~{per_session / 2**20:.2f} MiB per concurrent session")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", nargs="?", help="JSONL trace recorded via TRAFFIC_RECORD_PATH")
+    parser.add_argument("--sample", type=int, default=0, help="Replay N synthetic sessions instead of a trace")
+    parser.add_argument("--sample-window", type=float, default=600, help="Arrival window of synthetic sessions in seconds")
+    parser.add_argument("--speed", type=float, default=10, help="Divide arrival offsets and think times by this factor")
+    parser.add_argument("--llm-latency-ms", type=float, default=1500)
+    parser.add_argument("--llm-jitter-ms", type=float, default=400)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-cache-ttl", type=float, default=0, help="LLM_CACHE_TTL for the replay (0 measures uncached calls)")
+    parser.add_argument("--max-threads", type=int, default=512, help="Upper bound on concurrently replayed sessions")
+    args = parser.parse_args()
+
+    if not args.trace and not args.sample:
+        parser.error("give a trace file or --sample N")
+
+    os.environ["OPENAI_BASE_URL"] = start_stand_in_llm(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate)
+    os.environ["OPENAI_API_KEY"] = "replay"
+    os.environ["LLM_CACHE_TTL"] = str(args.llm_cache_ttl)
+
+    from src.ai_generator import enhance_resume_bullets, generate_cover_letter
+    from src.resume_parser import extract_text_from_bytes
+
+    # The generators report failures through Streamlit, which only logs outside a running app
+    logging.getLogger("streamlit").setLevel(logging.CRITICAL)
+    generators = {"cover_letter": generate_cover_letter, "resume_bullets": enhance_resume_bullets}
+
+    sessions = sample_sessions(args.sample, args.sample_window) if args.sample else load_sessions(args.trace)
+    if not sessions:
+        parser.error("the trace contains no sessions")
+    first_ts = min(events[0]["ts"] for events in sessions.values())
+
+    metrics = Metrics()
+    stop_sampling = threading.Event()
+    threading.Thread(target=metrics.sample_memory, args=(stop_sampling,), daemon=True).start()
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=min(args.max_threads, len(sessions))) as pool:
+        for events in sorted(sessions.values(), key=lambda events: events[0]["ts"]):
+            # The first event's think time is measured from before the session started
+            events = [dict(events[0], think_time=0.0)] + events[1:]
+            start_at = started + (events[0]["ts"] - first_ts) / args.speed
+            pool.submit(replay_session, events, start_at, args.speed, metrics, generators, extract_text_from_bytes)
+    wall_seconds = time.monotonic() - started
+    stop_sampling.set()
+
+    print_report(metrics, wall_seconds, len(sessions))
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,25 @@
 AI generation utilities using OpenAI's GPT models for cover letters and resume enhancement.
 """
 
+import hashlib
 import os
 import streamlit as st
 from openai import OpenAI
+from src.cache import get_cache
+from src.singleflight import SingleFlight, make_key
 
-def get_openai_client():
-    """Initialize and return OpenAI client"""
+# Identical requests in flight at the same time share one API call
+_inflight = SingleFlight()
+
+class GenerationError(Exception):
+    """Raised when no OpenAI client can be created and errors are not reported in the UI"""
+
+def get_openai_client(raise_errors=False):
+    """Initialize and return OpenAI client, raising GenerationError instead of using the UI if raise_errors is set"""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
+        if raise_errors:
+            raise GenerationError("OpenAI API key not found.")
         st.error("❌ OpenAI API key not found. Please set it in the sidebar.")
         return None
     
@@ -18,25 +29,135 @@ def get_openai_client():
         client = OpenAI(api_key=api_key)
         return client
     except Exception as e:
+        if raise_errors:
+            raise GenerationError(f"Failed to initialize OpenAI client: {str(e)}") from e
         st.error(f"❌ Failed to initialize OpenAI client: {str(e)}")
         st.error("💡 Try updating the OpenAI package: pip install --upgrade openai")
         return None
 
-def generate_cover_letter(resume_text, job_description):
+def _iter_stream(response):
+    """Yield text deltas from a streaming chat completion response"""
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def _create_completion(client, request):
+    """Call the API and keep the serializable parts of the response"""
+    response = client.chat.completions.create(**request)
+    usage = getattr(response, "usage", None)
+    return {
+        "content": response.choices[0].message.content.strip(),
+        "model": getattr(response, "model", None) or request["model"],
+        "usage": {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0
+        }
+    }
+
+def _shared_completion(client, request):
     """
-    Generate a tailored cover letter based on resume and job description.
+    Return a completion shared with identical requests.
+    
+    Concurrent identical requests in this process share one call. Setting
+    LLM_CACHE_TTL also keeps results in the shared cache ("llm" namespace) for
+    that many seconds so other sessions and worker processes reuse them; it is
+    off by default because sampled generations should differ on every click.
+    
+    Calls are only shared between clients using the same API key and endpoint,
+    so one account's errors and billing never reach another's callers.
+    """
+    account = f"{getattr(client, 'api_key', '')}:{getattr(client, 'base_url', '')}"
+    key = make_key(account=hashlib.sha256(account.encode("utf-8")).hexdigest(), **request)
+    ttl = float(os.getenv("LLM_CACHE_TTL", 0))
+    timeout = float(os.getenv("OPENAI_TIMEOUT", 600))
+    
+    def compute():
+        if ttl <= 0:
+            return _create_completion(client, request)
+        # Hold the lease as long as the call may run, so waiters never start a duplicate
+        return get_cache().get_or_compute(
+            "llm", key, lambda: _create_completion(client, request), ttl=ttl, lease_timeout=timeout
+        )
+    
+    return _inflight.do(key, compute, timeout=timeout)
+
+def _run_completion(system_prompt, prompt, max_tokens, temperature, action, with_metadata=False, stream=False,
+                    raise_errors=False):
+    """
+    Send a chat completion request and surface failures in the UI.
     
     Args:
-        resume_text (str): Extracted resume content
-        job_description (str): Job posting description
+        system_prompt (str): System message describing the assistant's role
+        prompt (str): User prompt with the resume and job description
+        max_tokens (int): Completion token limit
+        temperature (float): Sampling temperature
+        action (str): Short description used in error messages
+        with_metadata (bool): Return content together with model and token usage
+        stream (bool): Return an iterator of text chunks instead of the full text
+        raise_errors (bool): Raise failures to the caller instead of reporting
+            them in the UI, for callers running outside Streamlit
         
     Returns:
-        str: Generated cover letter or None if generation fails
+        str or dict: Generated text, or a dict with "content", "model" and
+        "usage" when with_metadata is set, or an iterator of text chunks when
+        stream is set. None if generation fails.
+    
+    Raises:
+        GenerationError or openai.OpenAIError: Only when raise_errors is set
     """
-    client = get_openai_client()
+    client = get_openai_client(raise_errors)
     if not client:
         return None
     
+    model = os.getenv("DEFAULT_MODEL", "gpt-4o-mini")  # Use gpt-4o-mini as fallback
+    request = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": temperature
+    }
+    try:
+        if stream:
+            # A stream can only be consumed once, so streaming calls are never shared
+            return _iter_stream(client.chat.completions.create(stream=True, **request))
+        
+        result = _shared_completion(client, request)
+        
+    except Exception as e:
+        if raise_errors:
+            raise
+        st.error(f"❌ Error {action}: {str(e)}")
+        if "rate_limit" in str(e).lower():
+            st.error("💡 Rate limit exceeded. Please wait a moment and try again.")
+        elif "quota" in str(e).lower():
+            st.error("💡 API quota exceeded. Please check your OpenAI billing.")
+        return None
+    
+    if not with_metadata:
+        return result["content"]
+    
+    # The result may be shared with other callers, so hand out a copy
+    return dict(result, usage=dict(result["usage"]))
+
+def generate_cover_letter(resume_text, job_description, with_metadata=False, stream=False, raise_errors=False):
+    """
+    Generate a tailored cover letter based on resume and job description.
+    
+    Args:
+        resume_text (str): Extracted resume content
+        job_description (str): Job posting description
+        with_metadata (bool): Also return the model and token usage
+        stream (bool): Return an iterator of text chunks as they are generated
+        raise_errors (bool): Raise API failures instead of reporting them in the UI
+        
+    Returns:
+        str: Generated cover letter (a metadata dict when with_metadata is set)
+             or None if generation fails
+    """
     prompt = f"""
     Based on the resume and job description provided below, write a professional, compelling cover letter that:
     
@@ -56,42 +177,32 @@ def generate_cover_letter(resume_text, job_description):
     Please write a cover letter that makes a strong case for why this candidate is perfect for this role. Start with "Dear Hiring Manager," and end with "Sincerely," followed by a placeholder for the candidate's name.
     """
     
-    try:
-        response = client.chat.completions.create(
-            model=os.getenv("DEFAULT_MODEL", "gpt-4o-mini"),  # Use gpt-4o-mini as fallback
-            messages=[
-                {"role": "system", "content": "You are an expert career coach and professional writer specializing in creating compelling cover letters that help candidates stand out."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=int(os.getenv("MAX_TOKENS", 800)),
-            temperature=float(os.getenv("TEMPERATURE", 0.7))
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        st.error(f"❌ Error generating cover letter: {str(e)}")
-        if "rate_limit" in str(e).lower():
-            st.error("💡 Rate limit exceeded. Please wait a moment and try again.")
-        elif "quota" in str(e).lower():
-            st.error("💡 API quota exceeded. Please check your OpenAI billing.")
-        return None
+    return _run_completion(
+        "You are an expert career coach and professional writer specializing in creating compelling cover letters that help candidates stand out.",
+        prompt,
+        max_tokens=int(os.getenv("MAX_TOKENS", 800)),
+        temperature=float(os.getenv("TEMPERATURE", 0.7)),
+        action="generating cover letter",
+        with_metadata=with_metadata,
+        stream=stream,
+        raise_errors=raise_errors
+    )
 
-def enhance_resume_bullets(resume_text, job_description):
+def enhance_resume_bullets(resume_text, job_description, with_metadata=False, stream=False, raise_errors=False):
     """
     Enhance resume bullet points to better match the job description.
     
     Args:
         resume_text (str): Extracted resume content
         job_description (str): Job posting description
+        with_metadata (bool): Also return the model and token usage
+        stream (bool): Return an iterator of text chunks as they are generated
+        raise_errors (bool): Raise API failures instead of reporting them in the UI
         
     Returns:
-        str: Enhanced resume suggestions or None if generation fails
+        str: Enhanced resume suggestions (a metadata dict when with_metadata is set)
+             or None if generation fails
     """
-    client = get_openai_client()
-    if not client:
-        return None
-    
     prompt = f"""
     Based on the resume and job description provided below, suggest improved bullet points for the resume that:
     
@@ -116,42 +227,32 @@ def enhance_resume_bullets(resume_text, job_description):
     Format your response as a bulleted list with explanations for why each enhancement would be effective.
     """
     
-    try:
-        response = client.chat.completions.create(
-            model=os.getenv("DEFAULT_MODEL", "gpt-4o-mini"),  # Use gpt-4o-mini as fallback
-            messages=[
-                {"role": "system", "content": "You are an expert resume writer and career coach who specializes in optimizing resumes for specific job opportunities using industry best practices."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=int(os.getenv("MAX_TOKENS", 1000)),
-            temperature=float(os.getenv("TEMPERATURE", 0.7))
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        st.error(f"❌ Error enhancing resume bullets: {str(e)}")
-        if "rate_limit" in str(e).lower():
-            st.error("💡 Rate limit exceeded. Please wait a moment and try again.")
-        elif "quota" in str(e).lower():
-            st.error("💡 API quota exceeded. Please check your OpenAI billing.")
-        return None
+    return _run_completion(
+        "You are an expert resume writer and career coach who specializes in optimizing resumes for specific job opportunities using industry best practices.",
+        prompt,
+        max_tokens=int(os.getenv("MAX_TOKENS", 1000)),
+        temperature=float(os.getenv("TEMPERATURE", 0.7)),
+        action="enhancing resume bullets",
+        with_metadata=with_metadata,
+        stream=stream,
+        raise_errors=raise_errors
+    )
 
-def analyze_job_match(resume_text, job_description):
+def analyze_job_match(resume_text, job_description, with_metadata=False, stream=False, raise_errors=False):
     """
     Analyze how well the resume matches the job description.
     
     Args:
         resume_text (str): Extracted resume content
         job_description (str): Job posting description
+        with_metadata (bool): Also return the model and token usage
+        stream (bool): Return an iterator of text chunks as they are generated
+        raise_errors (bool): Raise API failures instead of reporting them in the UI
         
     Returns:
-        dict: Match analysis with score and recommendations
+        str: Match analysis with score and recommendations (a metadata dict
+             when with_metadata is set) or None if generation fails
     """
-    client = get_openai_client()
-    if not client:
-        return None
-    
     prompt = f"""
     Analyze how well this resume matches the job description and provide:
     
@@ -170,23 +271,23 @@ def analyze_job_match(resume_text, job_description):
     Provide your analysis in a structured format.
     """
     
-    try:
-        response = client.chat.completions.create(
-            model=os.getenv("DEFAULT_MODEL", "gpt-4o-mini"),  # Use gpt-4o-mini as fallback
-            messages=[
-                {"role": "system", "content": "You are an expert ATS (Applicant Tracking System) analyzer and career coach who helps optimize resumes for specific job opportunities."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=int(os.getenv("MAX_TOKENS", 800)),
-            temperature=float(os.getenv("TEMPERATURE", 0.5))
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        st.error(f"❌ Error analyzing job match: {str(e)}")
-        if "rate_limit" in str(e).lower():
-            st.error("💡 Rate limit exceeded. Please wait a moment and try again.")
-        elif "quota" in str(e).lower():
-            st.error("💡 API quota exceeded. Please check your OpenAI billing.")
-        return None
+    return _run_completion(
+        "You are an expert ATS (Applicant Tracking System) analyzer and career coach who helps optimize resumes for specific job opportunities.",
+        prompt,
+        max_tokens=int(os.getenv("MAX_TOKENS", 800)),
+        temperature=float(os.getenv("TEMPERATURE", 0.5)),
+        action="analyzing job match",
+        with_metadata=with_metadata,
+        stream=stream,
+        raise_errors=raise_errors
+    )
+
+def get_inflight_stats():
+    """
+    Report how many completion requests ran (answered by the cache or the API)
+    and how many were saved by sharing identical concurrent requests.
+    
+    Returns:
+        dict: Counts of executed, saved and in-flight calls
+    """
+    return _inflight.stats()
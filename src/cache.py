@@ -0,0 +1,400 @@
+"""
+Cache shared by the parser and the AI generator, with interchangeable backends.
+
+Backends:
+    memory   In-process LRU (default); private to one worker process
+    sqlite   SQLite file shared by every process on the host
+    redis    Any local Redis-protocol server (Redis, Valkey, KeyDB); needs the redis package
+
+Every backend stores values as the same JSON encoding, evicts least recently
+used entries once a namespace exceeds its size limit, and protects
+get_or_compute against stampedes with a lease so that only one caller
+computes a missing value while the others wait for it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import warnings
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+DEFAULT_NAMESPACE_LIMITS = {
+    "parse": 256,
+    "ocr": 512,
+    "llm": 1024
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def _dumps(value):
+    """Serialize a value the same way for every backend"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _loads(data):
+    return json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+
+def get_namespace_limits():
+    """Return per-namespace entry limits, overridden by CACHE_NAMESPACE_LIMITS (e.g. "parse=100,llm=500")"""
+    limits = dict(DEFAULT_NAMESPACE_LIMITS)
+    for item in os.getenv("CACHE_NAMESPACE_LIMITS", "").split(","):
+        name, _, limit = item.partition("=")
+        if name.strip() and limit.strip():
+            limits[name.strip()] = int(limit)
+    return limits
+
+class CacheBackend(ABC):
+    """Common interface and stampede-protected get_or_compute for all backends"""
+
+    def __init__(self, namespace_limits=None):
+        self.namespace_limits = namespace_limits or get_namespace_limits()
+        self.default_limit = int(os.getenv("CACHE_DEFAULT_LIMIT", 1000))
+        self.lease_timeout = float(os.getenv("CACHE_LOCK_TIMEOUT", 120))
+
+    def limit_for(self, namespace):
+        return self.namespace_limits.get(namespace, self.default_limit)
+
+    @abstractmethod
+    def get(self, namespace, key):
+        """Return the cached value, or None if it is missing or expired"""
+
+    @abstractmethod
+    def set(self, namespace, key, value, ttl=None):
+        """Store a JSON-serializable value, expiring after ttl seconds if given"""
+
+    @abstractmethod
+    def delete(self, namespace, key):
+        """Remove a value if present"""
+
+    @abstractmethod
+    def _acquire_lease(self, namespace, key, owner, timeout):
+        """Take the compute lease for timeout seconds; return False if another owner holds it"""
+
+    @abstractmethod
+    def _release_lease(self, namespace, key, owner):
+        """Give up the compute lease if owner still holds it"""
+
+    def get_or_compute(self, namespace, key, compute, ttl=None, should_cache=None, lease_timeout=None):
+        """
+        Return the cached value, computing and storing it on a miss.
+
+        Only the caller holding the lease computes; concurrent callers, in
+        this or another process, poll until the value appears. If the holder
+        dies, its lease expires after lease_timeout (CACHE_LOCK_TIMEOUT by
+        default) and another caller takes over. None results are returned but not cached. A failing
+        cache never costs a computed value: errors from the backend fall back
+        to computing, or to returning the value without storing it.
+
+        Args:
+            namespace (str): Cache namespace, e.g. "parse" or "llm"
+            key (str): Key within the namespace
+            compute (callable): Zero-argument function producing the value
+            ttl (float): Optional lifetime of the stored value in seconds
+            should_cache (callable): Optional predicate; values it rejects are
+                returned without being stored
+            lease_timeout (float): Optional lease lifetime in seconds; should
+                exceed the longest expected compute time
+
+        Returns:
+            object: Cached or freshly computed value
+        """
+        try:
+            value = self.get(namespace, key)
+            if value is not None:
+                return value
+
+            owner = uuid.uuid4().hex
+            lease_timeout = lease_timeout or self.lease_timeout
+            deadline = time.monotonic() + lease_timeout
+            while not self._acquire_lease(namespace, key, owner, lease_timeout):
+                time.sleep(0.05)
+                value = self.get(namespace, key)
+                if value is not None:
+                    return value
+                if time.monotonic() > deadline:
+                    return compute()
+        except Exception:
+            # Cache unreachable or locked; work without it rather than fail the request
+            return compute()
+
+        try:
+            try:
+                # Another holder may have stored the value just before our lease
+                value = self.get(namespace, key)
+            except Exception:
+                value = None
+            if value is None:
+                value = compute()
+                if value is not None and (should_cache is None or should_cache(value)):
+                    try:
+                        self.set(namespace, key, value, ttl)
+                    except Exception:
+                        pass  # Keep the computed value; a later call recomputes it
+            return value
+        finally:
+            try:
+                self._release_lease(namespace, key, owner)
+            except Exception:
+                pass  # The lease expires on its own
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache, one OrderedDict per namespace"""
+
+    def __init__(self, namespace_limits=None):
+        super().__init__(namespace_limits)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._leases = {}
+
+    def get(self, namespace, key):
+        with self._lock:
+            entries = self._entries.get(namespace)
+            if not entries or key not in entries:
+                return None
+            data, expires_at = entries[key]
+            if expires_at is not None and expires_at <= time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+        return _loads(data)
+
+    def set(self, namespace, key, value, ttl=None):
+        data = _dumps(value)
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            entries[key] = (data, expires_at)
+            entries.move_to_end(key)
+            while len(entries) > self.limit_for(namespace):
+                entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._entries.get(namespace, {}).pop(key, None)
+
+    def _acquire_lease(self, namespace, key, owner, timeout):
+        now = time.monotonic()
+        with self._lock:
+            lease = self._leases.get((namespace, key))
+            if lease and lease[1] > now:
+                return False
+            self._leases[(namespace, key)] = (owner, now + timeout)
+            return True
+
+    def _release_lease(self, namespace, key, owner):
+        with self._lock:
+            lease = self._leases.get((namespace, key))
+            if lease and lease[0] == owner:
+                del self._leases[(namespace, key)]
+
+class SQLiteCache(CacheBackend):
+    """Cache in a SQLite file that every local worker process opens"""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value BLOB NOT NULL,
+        expires_at REAL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries (namespace, accessed_at);
+    CREATE TABLE IF NOT EXISTS cache_leases (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path, namespace_limits=None):
+        super().__init__(namespace_limits)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(self._SCHEMA)
+        conn.commit()
+
+    def _connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=67108864")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if row[1] is not None and row[1] <= now:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            return None
+        conn.execute(
+            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key)
+        )
+        return _loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, _dumps(value), now + ttl if ttl else None, now)
+            )
+            excess = conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (namespace,)
+            ).fetchone()[0] - self.limit_for(namespace)
+            if excess > 0:
+                conn.execute(
+                    """
+                    DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache_entries WHERE namespace = ?
+                        ORDER BY accessed_at LIMIT ?
+                    )
+                    """,
+                    (namespace, namespace, excess)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, namespace, key):
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def _acquire_lease(self, namespace, key, owner, timeout):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM cache_leases WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                (namespace, key, now)
+            )
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO cache_leases VALUES (?, ?, ?, ?)",
+                (namespace, key, owner, now + timeout)
+            ).rowcount == 1
+            conn.execute("COMMIT")
+            return acquired
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release_lease(self, namespace, key, owner):
+        self._connection().execute(
+            "DELETE FROM cache_leases WHERE namespace = ? AND key = ? AND owner = ?",
+            (namespace, key, owner)
+        )
+
+class RedisCache(CacheBackend):
+    """Cache on a local Redis-protocol server, with a sorted set per namespace tracking recency"""
+
+    # Delete the lease only if the caller still owns it, in one atomic step
+    _RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url, namespace_limits=None, prefix="resume-cache"):
+        import redis
+
+        super().__init__(namespace_limits)
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._release = self._redis.register_script(self._RELEASE_SCRIPT)
+
+    def _key(self, namespace, key):
+        return f"{self._prefix}:{namespace}:{key}"
+
+    def _recency_key(self, namespace):
+        return f"{self._prefix}:{namespace}:__recency__"
+
+    def get(self, namespace, key):
+        data = self._redis.get(self._key(namespace, key))
+        if data is None:
+            return None
+        self._redis.zadd(self._recency_key(namespace), {key: time.time()})
+        return _loads(data)
+
+    def set(self, namespace, key, value, ttl=None):
+        recency_key = self._recency_key(namespace)
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(namespace, key), _dumps(value), ex=int(ttl) if ttl else None)
+        pipe.zadd(recency_key, {key: time.time()})
+        pipe.zcard(recency_key)
+        excess = pipe.execute()[-1] - self.limit_for(namespace)
+        if excess > 0:
+            oldest = self._redis.zrange(recency_key, 0, excess - 1)
+            if oldest:
+                pipe = self._redis.pipeline()
+                pipe.delete(*(self._key(namespace, old.decode("utf-8")) for old in oldest))
+                pipe.zrem(recency_key, *oldest)
+                pipe.execute()
+
+    def delete(self, namespace, key):
+        pipe = self._redis.pipeline()
+        pipe.delete(self._key(namespace, key))
+        pipe.zrem(self._recency_key(namespace), key)
+        pipe.execute()
+
+    def _acquire_lease(self, namespace, key, owner, timeout):
+        lease_key = self._key(namespace, key) + ":lease"
+        return bool(self._redis.set(lease_key, owner, nx=True, px=int(timeout * 1000)))
+
+    def _release_lease(self, namespace, key, owner):
+        self._release(keys=[self._key(namespace, key) + ":lease"], args=[owner])
+
+def create_cache(backend=None):
+    """
+    Create a cache backend from configuration.
+
+    Args:
+        backend (str): 'memory', 'sqlite' or 'redis'; defaults to CACHE_BACKEND
+
+    Returns:
+        CacheBackend: Configured backend, falling back to memory if redis is unavailable
+    """
+    backend = (backend or os.getenv("CACHE_BACKEND", "memory")).lower()
+    if backend == "sqlite":
+        return SQLiteCache(os.getenv("CACHE_PATH", os.path.join(".data", "cache.db")))
+    if backend == "redis":
+        try:
+            return RedisCache(os.getenv("CACHE_URL", "redis://localhost:6379/0"))
+        except ImportError:
+            warnings.warn("CACHE_BACKEND=redis needs the redis package; using the in-process cache")
+    return MemoryCache()
+
+def get_cache():
+    """Return the process-wide cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
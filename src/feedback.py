@@ -0,0 +1,86 @@
+"""
+Batched, append-only feedback log.
+
+Ratings are buffered in memory and appended to a JSON Lines file in batches,
+so a feedback click never waits on disk I/O. Only a hash and the length of
+the rated content are logged, never the content itself, and the user id is
+replaced by a salted hash because it is the key to the user's history.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+_buffer = []
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+def get_feedback_log_path():
+    """Return the configured feedback log path"""
+    return os.getenv("FEEDBACK_LOG_PATH", os.path.join(".data", "feedback.jsonl"))
+
+def _anonymize(user_id):
+    """Replace a user id with an opaque, stable hash salted by FEEDBACK_LOG_SALT"""
+    if user_id is None:
+        return None
+    salt = os.getenv("FEEDBACK_LOG_SALT", "")
+    return hashlib.sha256(f"{salt}:{user_id}".encode("utf-8")).hexdigest()[:12]
+
+def record_feedback(result_type, rating, content, user_id=None):
+    """
+    Queue a feedback rating and flush the batch when it is full or old enough.
+
+    Args:
+        result_type (str): Type of result ('cover_letter' or 'resume_bullets')
+        rating (str): Rating given ('great', 'good' or 'needs_work')
+        content (str): Rated content, identified in the log by its hash
+        user_id (str): Optional user identifier, logged only as a salted hash
+    """
+    global _last_flush
+    entry = {
+        "timestamp": time.time(),
+        "user_id": _anonymize(user_id),
+        "result_type": result_type,
+        "rating": rating,
+        "content_hash": hashlib.sha256(content.encode("utf-8")).hexdigest()[:16],
+        "content_length": len(content)
+    }
+
+    with _lock:
+        _buffer.append(entry)
+        batch_full = len(_buffer) >= int(os.getenv("FEEDBACK_BATCH_SIZE", 20))
+        batch_old = time.monotonic() - _last_flush >= float(os.getenv("FEEDBACK_FLUSH_SECONDS", 30))
+        if not (batch_full or batch_old):
+            return
+        batch = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+
+    _append(batch)
+
+def flush_feedback():
+    """Write any buffered feedback to the log"""
+    global _last_flush
+    with _lock:
+        batch = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    _append(batch)
+
+def _append(batch):
+    """Append a batch of entries to the log in a single write"""
+    if not batch:
+        return
+    path = get_feedback_log_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    lines = "".join(json.dumps(entry) + "\n" for entry in batch)
+    with _write_lock, open(path, "a", encoding="utf-8") as log_file:
+        log_file.write(lines)
+
+atexit.register(flush_feedback)
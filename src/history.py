@@ -0,0 +1,235 @@
+"""
+Persistent generation history backed by SQLite with a full-text search index.
+
+Each generated cover letter or bullet list is stored per user together with
+its inputs, the model that produced it and its token usage, so that results
+can be re-opened or re-downloaded without another OpenAI request.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    resume_text TEXT NOT NULL,
+    job_description TEXT NOT NULL,
+    content TEXT NOT NULL,
+    model TEXT,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generations_user_created
+    ON generations (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_generations_created
+    ON generations (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS generations_fts USING fts5(
+    job_description, content,
+    content='generations', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS generations_ai AFTER INSERT ON generations BEGIN
+    INSERT INTO generations_fts (rowid, job_description, content)
+    VALUES (new.id, new.job_description, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS generations_ad AFTER DELETE ON generations BEGIN
+    INSERT INTO generations_fts (generations_fts, rowid, job_description, content)
+    VALUES ('delete', old.id, old.job_description, old.content);
+END;
+"""
+
+_SUMMARY_COLUMNS = "g.id, g.kind, g.model, g.total_tokens, g.created_at"
+
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+def get_history_db_path():
+    """Return the configured history database path"""
+    return os.getenv("HISTORY_DB_PATH", os.path.join(".data", "history.db"))
+
+def _connect(db_path=None):
+    """Open a connection to the history database, creating the schema on first use"""
+    db_path = db_path or get_history_db_path()
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+
+    if db_path not in _initialized_paths:
+        with _init_lock:
+            if db_path not in _initialized_paths:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(generations)")}
+                if "input_hash" in columns:
+                    # Databases created while identical requests were looked up by input hash
+                    conn.execute("DROP INDEX IF EXISTS idx_generations_lookup")
+                    conn.execute("ALTER TABLE generations DROP COLUMN input_hash")
+                conn.commit()
+                _initialized_paths.add(db_path)
+    return conn
+
+def save_generation(user_id, kind, resume_text, job_description, result, db_path=None):
+    """
+    Store a generation result and apply the retention policy for the user.
+
+    Args:
+        user_id (str): Identifier returned by get_user_id
+        kind (str): Result type ('cover_letter' or 'resume_bullets')
+        resume_text (str): Resume content sent to the model
+        job_description (str): Job description sent to the model
+        result (dict): Generation metadata with content, model and usage
+        db_path (str): Optional database path override
+
+    Returns:
+        int: Identifier of the stored entry
+    """
+    usage = result.get("usage") or {}
+    content = result["content"]
+    size_bytes = sum(len(text.encode("utf-8")) for text in (resume_text, job_description, content))
+
+    conn = _connect(db_path)
+    try:
+        with conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO generations (
+                    user_id, kind, resume_text, job_description, content,
+                    model, prompt_tokens, completion_tokens, total_tokens, size_bytes, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    user_id, kind, resume_text, job_description, content,
+                    result.get("model"),
+                    usage.get("prompt_tokens", 0),
+                    usage.get("completion_tokens", 0),
+                    usage.get("total_tokens", 0),
+                    size_bytes,
+                    time.time()
+                )
+            )
+            entry_id = cursor.lastrowid
+            _apply_retention(conn, user_id)
+        return entry_id
+    finally:
+        conn.close()
+
+def get_generation(user_id, entry_id, db_path=None):
+    """
+    Fetch a single stored entry, including its full inputs and content.
+
+    Args:
+        user_id (str): Identifier returned by get_user_id
+        entry_id (int): Entry identifier
+        db_path (str): Optional database path override
+
+    Returns:
+        dict: Stored entry or None if it does not exist for this user
+    """
+    conn = _connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT * FROM generations WHERE id = ? AND user_id = ?",
+            (entry_id, user_id)
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+def _build_match_query(query):
+    """Turn free text into an FTS5 query that matches every word as a prefix"""
+    terms = re.findall(r"\w+", query or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+def list_generations(user_id, page=1, page_size=10, query=None, db_path=None):
+    """
+    List a page of stored entries, newest first, optionally filtered by a search query.
+
+    Args:
+        user_id (str): Identifier returned by get_user_id
+        page (int): 1-based page number
+        page_size (int): Number of entries per page
+        query (str): Optional full-text search over job descriptions and content
+        db_path (str): Optional database path override
+
+    Returns:
+        tuple: (entries, total) where entries is a list of summary dicts
+    """
+    page = max(int(page), 1)
+    offset = (page - 1) * page_size
+    match_query = _build_match_query(query)
+
+    conn = _connect(db_path)
+    try:
+        if match_query:
+            total = conn.execute(
+                """
+                SELECT COUNT(*) FROM generations_fts f
+                JOIN generations g ON g.id = f.rowid
+                WHERE generations_fts MATCH ? AND g.user_id = ?
+                """,
+                (match_query, user_id)
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT {_SUMMARY_COLUMNS},
+                       snippet(generations_fts, 1, '**', '**', '…', 24) AS preview
+                FROM generations_fts f
+                JOIN generations g ON g.id = f.rowid
+                WHERE generations_fts MATCH ? AND g.user_id = ?
+                ORDER BY g.created_at DESC
+                LIMIT ? OFFSET ?
+                """,
+                (match_query, user_id, page_size, offset)
+            ).fetchall()
+        else:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM generations WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT {_SUMMARY_COLUMNS}, substr(g.content, 1, 160) AS preview
+                FROM generations g
+                WHERE g.user_id = ?
+                ORDER BY g.created_at DESC
+                LIMIT ? OFFSET ?
+                """,
+                (user_id, page_size, offset)
+            ).fetchall()
+        return [dict(row) for row in rows], total
+    finally:
+        conn.close()
+
+def _apply_retention(conn, user_id):
+    """Delete entries that are too old or exceed the user's count or size budget"""
+    max_age_days = float(os.getenv("HISTORY_MAX_AGE_DAYS", 30))
+    max_entries = int(os.getenv("HISTORY_MAX_ENTRIES", 200))
+    max_bytes = int(os.getenv("HISTORY_MAX_BYTES", 5 * 1024 * 1024))
+
+    cutoff = time.time() - max_age_days * 86400
+    removed = conn.execute("DELETE FROM generations WHERE created_at < ?", (cutoff,)).rowcount
+    removed += conn.execute(
+        """
+        DELETE FROM generations WHERE id IN (
+            SELECT id FROM (
+                SELECT id,
+                       ROW_NUMBER() OVER (ORDER BY created_at DESC) AS position,
+                       SUM(size_bytes) OVER (ORDER BY created_at DESC) AS running_bytes
+                FROM generations WHERE user_id = ?
+            )
+            WHERE position > 1 AND (position > ? OR running_bytes > ?)
+        )
+        """,
+        (user_id, max_entries, max_bytes)
+    ).rowcount
+    return removed
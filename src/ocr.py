@@ -0,0 +1,164 @@
+"""
+OCR fallback for scanned resume pages.
+
+Pages are recognized in a bounded process pool, one task per page, and the
+results are stored in the shared cache ("ocr" namespace) keyed on a hash of
+the page's image content. The backend is any importable callable taking
+image bytes and returning text, configured as "module:function" through the
+OCR_BACKEND environment variable.
+"""
+
+import hashlib
+import importlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from src.cache import get_cache
+
+DEFAULT_BACKEND = "src.ocr:tesseract_backend"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def tesseract_backend(image_bytes):
+    """Recognize text in an image with a local Tesseract install (needs pytesseract and Pillow)"""
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        return pytesseract.image_to_string(image)
+
+def get_backend_spec():
+    """Return the configured OCR backend as a "module:function" string"""
+    return os.getenv("OCR_BACKEND", DEFAULT_BACKEND)
+
+def _load_backend(spec):
+    """Import the OCR callable named by a "module:function" spec"""
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+def _recognize_page(spec, images):
+    """Run the OCR backend over every image on a page (executes in a worker process)"""
+    backend = _load_backend(spec)
+    return "\n".join(backend(image_bytes) for image_bytes in images).strip()
+
+def _get_executor():
+    """Return the shared OCR process pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Spawn rather than fork: the Streamlit server is multi-threaded
+                _executor = ProcessPoolExecutor(
+                    max_workers=int(os.getenv("OCR_MAX_WORKERS", 2)),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+def _reset_executor():
+    """Drop a broken process pool so the next call starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def page_content_hash(images, spec=None):
+    """
+    Hash the image content of a page together with the backend that reads it.
+
+    Args:
+        images (list): Raw image bytes found on the page
+        spec (str): OCR backend spec, defaults to the configured backend
+
+    Returns:
+        str: Hex digest used as the OCR cache key
+    """
+    digest = hashlib.sha256((spec or get_backend_spec()).encode("utf-8"))
+    for image_bytes in images:
+        digest.update(len(image_bytes).to_bytes(8, "big"))
+        digest.update(image_bytes)
+    return digest.hexdigest()
+
+def _cache_get(key):
+    try:
+        return get_cache().get("ocr", key)
+    except Exception:
+        return None
+
+def _cache_set(key, text):
+    # Recognized pages are resume content, so they expire with parsed resumes
+    ttl = float(os.getenv("PARSE_CACHE_TTL", 3600))
+    if ttl <= 0:
+        return
+    try:
+        get_cache().set("ocr", key, text, ttl)
+    except Exception:
+        pass  # Caching is an optimization; a failed write only costs a later re-run
+
+class OCRJob:
+    """Pending recognition of one page, created by submit_page"""
+
+    def __init__(self, key, future=None, text=None):
+        self._key = key
+        self._future = future
+        self._text = text
+
+    def done(self):
+        """Check whether the page text is available without blocking"""
+        return self._future is None or self._future.done()
+
+    def text(self, timeout=None):
+        """
+        Wait for the page text.
+
+        Args:
+            timeout (float): Seconds to wait, defaults to OCR_PAGE_TIMEOUT
+
+        Returns:
+            str: Recognized text, or an empty string if recognition failed
+        """
+        if self._future is None:
+            return self._text or ""
+        if timeout is None:
+            timeout = float(os.getenv("OCR_PAGE_TIMEOUT", 60))
+        try:
+            text = self._future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._future.cancel()
+            text = ""
+        except BrokenProcessPool:
+            _reset_executor()
+            text = ""
+        except Exception:
+            # Missing backend or unreadable image; the caller reports empty pages
+            text = ""
+        else:
+            _cache_set(self._key, text)
+        self._future = None
+        self._text = text
+        return text
+
+def submit_page(images):
+    """
+    Start recognizing one image-only page without waiting for it.
+
+    Args:
+        images (list): Raw image bytes found on the page
+
+    Returns:
+        OCRJob: Handle for the page text
+    """
+    spec = get_backend_spec()
+    key = page_content_hash(images, spec)
+    cached = _cache_get(key)
+    if cached is not None:
+        return OCRJob(key, text=cached)
+    try:
+        return OCRJob(key, future=_get_executor().submit(_recognize_page, spec, images))
+    except Exception:
+        return OCRJob(key, text="")
@@ -2,31 +2,124 @@
 Resume parsing utilities for extracting text from PDF and DOCX files.
 """
 
+import hashlib
+import os
 import streamlit as st
 import PyPDF2
+from collections import deque
 from docx import Document
 from io import BytesIO
+from src.cache import get_cache
+from src.ocr import submit_page
+from src.text_normalizer import LINE_BREAK_FIXERS, get_configured_fixers, normalize_lines, normalize_pages
+
+def _page_images(page):
+    """Return the raw bytes of every image embedded in a PDF page, or None if they cannot be decoded"""
+    try:
+        return [image.data for image in page.images]
+    except Exception:
+        # Image filters PyPDF2 cannot decode, e.g. JBIG2 in many scans
+        return None
+
+def _needs_ocr(page_text):
+    """Check whether a page carries too little text to be anything but a scan"""
+    return len(page_text.strip()) < int(os.getenv("OCR_MIN_PAGE_CHARS", 40))
+
+def _iter_pdf_pages(pdf_reader, unreadable):
+    """
+    Yield page texts in order as they are extracted, sending scanned pages to OCR.
+    
+    Text-bearing pages are yielded as soon as every page before them is ready,
+    while image-only pages are recognized in parallel in the background.
+    
+    Args:
+        pdf_reader (PyPDF2.PdfReader): Opened PDF
+        unreadable (list): Receives the numbers of scanned pages OCR could not read
+    """
+    def resolve(number, page_text, job):
+        if job is None:
+            return page_text
+        ocr_text = job.text()
+        if ocr_text.strip():
+            return ocr_text
+        unreadable.append(number)
+        return page_text
+    
+    pending = deque()
+    for number, page in enumerate(pdf_reader.pages, start=1):
+        page_text = page.extract_text() or ""
+        images = _page_images(page) if _needs_ocr(page_text) else []
+        if images is None:
+            # A scan whose images cannot be decoded can't be recognized either
+            unreadable.append(number)
+            images = []
+        pending.append((number, page_text, submit_page(images) if images else None))
+        
+        while pending and (pending[0][2] is None or pending[0][2].done()):
+            yield resolve(*pending.popleft())
+    
+    while pending:
+        yield resolve(*pending.popleft())
+
+def _read_pdf(file_bytes):
+    """Return the normalized text of a PDF and the number of scanned pages OCR could not read"""
+    unreadable = []
+    pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
+    pages = _iter_pdf_pages(pdf_reader, unreadable)
+    text = "\n".join(normalize_pages(pages, get_configured_fixers()))
+    return text, len(unreadable)
+
+def _read_docx(file_bytes):
+    """Return the normalized text of a DOCX; it has no scanned pages"""
+    doc = Document(BytesIO(file_bytes))
+    paragraphs = (paragraph.text for paragraph in doc.paragraphs)
+    # Paragraph text never wraps, so every line break in it is deliberate
+    fixers = [name for name in get_configured_fixers() if name not in LINE_BREAK_FIXERS]
+    return "\n".join(normalize_lines(paragraphs, fixers)), 0
+
+def _read_cached(read, file_bytes):
+    """
+    Run a reader through the shared "parse" cache so identical uploads are parsed once
+    
+    Results with unreadable scanned pages are never stored, so a missing OCR
+    engine or a timeout is retried on the next upload. PARSE_CACHE_TTL=0
+    keeps parsed resumes out of the cache entirely.
+    """
+    ttl = float(os.getenv("PARSE_CACHE_TTL", 3600))
+    if ttl <= 0:
+        return read(file_bytes)
+    
+    digest = hashlib.sha256(",".join(get_configured_fixers()).encode("utf-8"))
+    digest.update(file_bytes)
+    return get_cache().get_or_compute(
+        "parse",
+        f"{read.__name__}:{digest.hexdigest()}",
+        lambda: read(file_bytes),
+        ttl=ttl,
+        should_cache=lambda parsed: not parsed[1]
+    )
 
 def extract_text_from_pdf(file_bytes):
-    """Extract text from PDF file bytes"""
+    """Extract and normalize text from PDF file bytes, running OCR on pages that are scanned images"""
     try:
-        pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        text, unreadable = _read_cached(_read_pdf, file_bytes)
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return None
+    
+    if unreadable:
+        st.warning(
+            f"⚠️ {unreadable} scanned page(s) could not be read. "
+            "Install pytesseract and Tesseract OCR, or upload a text-based PDF."
+        )
+    
+    return text
 
 def extract_text_from_docx(file_bytes):
-    """Extract text from DOCX file bytes"""
+    """Extract and normalize text from DOCX file bytes"""
     try:
-        doc = Document(BytesIO(file_bytes))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        text, _ = _read_cached(_read_docx, file_bytes)
+        return text
     except Exception as e:
         st.error(f"Error reading DOCX: {str(e)}")
         return None
@@ -44,23 +137,91 @@ def extract_text_from_file(uploaded_file):
     if uploaded_file is None:
         return None
     
-    file_bytes = uploaded_file.read()
-    file_type = uploaded_file.type
+    return extract_text_from_bytes(uploaded_file.read(), uploaded_file.name, uploaded_file.type)
+
+def extract_text_once(uploaded_file):
+    """
+    Extract text from an uploaded file once per session, reusing it on later reruns
+    
+    Args:
+        uploaded_file: Streamlit uploaded file object
+        
+    Returns:
+        tuple: (text, file_key) where file_key is a hash of the file content;
+        text is None if extraction fails
+    """
+    file_key = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    parsed = st.session_state.get("parsed_resume")
+    if parsed and parsed["file_key"] == file_key:
+        return parsed["text"], file_key
     
-    if file_type == "application/pdf" or uploaded_file.name.lower().endswith('.pdf'):
-        return extract_text_from_pdf(file_bytes)
-    elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document" or uploaded_file.name.lower().endswith('.docx'):
-        return extract_text_from_docx(file_bytes)
-    else:
+    text = extract_text_from_file(uploaded_file)
+    st.session_state["parsed_resume"] = {"file_key": file_key, "text": text} if text else None
+    return text, file_key
+
+def get_extractor(file_name, file_type=None):
+    """
+    Pick the extraction function for a file
+    
+    Args:
+        file_name (str): Original file name, used when the MIME type is missing
+        file_type (str): MIME type reported by the client
+        
+    Returns:
+        callable: Function taking the file bytes, or None if the type is unsupported
+    """
+    file_name = (file_name or "").lower()
+    
+    if file_type == "application/pdf" or file_name.endswith('.pdf'):
+        return extract_text_from_pdf
+    if file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document" or file_name.endswith('.docx'):
+        return extract_text_from_docx
+    return None
+
+def extract_text_from_bytes(file_bytes, file_name, file_type=None):
+    """
+    Extract text from raw file bytes (PDF or DOCX)
+    
+    Args:
+        file_bytes (bytes): File content
+        file_name (str): Original file name, used when the MIME type is missing
+        file_type (str): MIME type reported by the client
+        
+    Returns:
+        str: Extracted text or None if extraction fails
+    """
+    extract = get_extractor(file_name, file_type)
+    if extract is None:
         st.error(f"Unsupported file type: {file_type}")
         return None
+    
+    return extract(file_bytes)
+
+def count_pages(file_bytes, file_name):
+    """
+    Count the pages of a PDF without extracting its text
+    
+    Args:
+        file_bytes (bytes): File content
+        file_name (str): Original file name
+        
+    Returns:
+        int: Page count, or None for non-PDF or unreadable files
+    """
+    if not (file_name or "").lower().endswith('.pdf'):
+        return None
+    try:
+        return len(PyPDF2.PdfReader(BytesIO(file_bytes)).pages)
+    except Exception:
+        return None
 
-def clean_resume_text(text):
+def clean_resume_text(text, fixers=None):
     """
     Clean and format resume text for better AI processing
     
     Args:
         text (str): Raw resume text
+        fixers (iterable): Normalization fixers to apply, defaults to the configured set
         
     Returns:
         str: Cleaned resume text
@@ -68,12 +229,6 @@ def clean_resume_text(text):
     if not text:
         return ""
     
-    # Remove extra whitespace and normalize line breaks
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    cleaned_text = '\n'.join(lines)
-    
-    # Remove excessive blank lines
-    while '\n\n\n' in cleaned_text:
-        cleaned_text = cleaned_text.replace('\n\n\n', '\n\n')
-    
-    return cleaned_text
+    if fixers is None:
+        fixers = get_configured_fixers()
+    return "\n".join(normalize_lines([text], fixers))
@@ -0,0 +1,201 @@
+"""
+Background preparation of resume features right after upload.
+
+Section segmentation, skill extraction and building the labelled prompt block
+run in a worker thread while the user is still pasting the job description,
+so the generate buttons only have to send the request. The text arrives
+already normalized by the parser, with the fixers suited to its file type. Work is tracked per session
+and cancelled when a different file is uploaded.
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment history", "work history", "employment"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "core competencies", "key skills", "technologies", "tools and technologies"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications"],
+    "awards": ["awards", "honors", "achievements", "honors and awards"],
+    "publications": ["publications"],
+    "languages": ["languages"],
+    "volunteer": ["volunteer experience", "volunteering", "volunteer work"]
+}
+
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+_SKILL_SEPARATORS = re.compile(r"[,;|•·▪●\n]")
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RESUME_PIPELINE_WORKERS", 4)),
+    thread_name_prefix="resume-pipeline"
+)
+
+class PipelineCancelled(Exception):
+    """Raised inside the pipeline when its resume has been replaced"""
+
+def _match_heading(line):
+    """Return the section name for a heading line, or None for ordinary content"""
+    normalized = re.sub(r"[^a-z& ]", "", line.lower().replace("&", "and")).strip()
+    return _HEADING_LOOKUP.get(normalized)
+
+def segment_sections(text):
+    """
+    Split resume text into sections by recognized headings.
+
+    Args:
+        text (str): Extracted resume text, one line per entry
+
+    Returns:
+        dict: Section name mapped to its text, in document order; content
+        before the first heading is stored under "header"
+    """
+    sections = {}
+    current = "header"
+    for line in text.split("\n"):
+        section = _match_heading(line) if len(line) <= 40 else None
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+def extract_skills(sections):
+    """
+    Extract individual skills listed in the skills section.
+
+    Args:
+        sections (dict): Output of segment_sections
+
+    Returns:
+        list: Unique skills in the order they appear
+    """
+    skills = []
+    seen = set()
+    for item in _SKILL_SEPARATORS.split(sections.get("skills", "")):
+        # Drop category labels such as "Languages: Python"
+        item = item.split(":", 1)[-1].strip(" -–\t")
+        key = item.lower()
+        if 1 < len(item) <= 40 and key not in seen:
+            seen.add(key)
+            skills.append(item)
+    return skills
+
+def compact_resume(sections, skills):
+    """
+    Build the labelled resume block sent in prompts.
+
+    Every line of every section is kept, under a label naming its section;
+    only whitespace is collapsed and consecutive repeated lines are dropped.
+    The extracted skills are listed after the header so the model can match
+    them against the job description at a glance.
+
+    Args:
+        sections (dict): Output of segment_sections
+        skills (list): Output of extract_skills
+
+    Returns:
+        str: Labelled resume text
+    """
+    blocks = []
+    for name, body in sections.items():
+        lines = []
+        for line in body.split("\n"):
+            line = " ".join(line.split())
+            if line and (not lines or lines[-1] != line):
+                lines.append(line)
+        if lines:
+            blocks.append((name, "\n".join(lines)))
+
+    labelled = [body for name, body in blocks if name == "header"]
+    if skills:
+        labelled.append("KEY SKILLS: " + ", ".join(skills))
+    labelled.extend(f"{name.upper()}:\n{body}" for name, body in blocks if name != "header")
+    return "\n\n".join(labelled)
+
+def prepare_resume_features(resume_text, cancel_event=None):
+    """
+    Run every preparation stage for a resume.
+
+    Args:
+        resume_text (str): Extracted, normalized resume text
+        cancel_event (threading.Event): Set to abandon the work between stages
+
+    Returns:
+        dict: sections, skills and prompt_resume
+
+    Raises:
+        PipelineCancelled: If cancel_event is set before the work finishes
+    """
+    def checkpoint():
+        if cancel_event is not None and cancel_event.is_set():
+            raise PipelineCancelled()
+
+    sections = segment_sections(resume_text)
+    checkpoint()
+    skills = extract_skills(sections)
+    checkpoint()
+    prompt_resume = compact_resume(sections, skills)
+    checkpoint()
+
+    return {
+        "sections": sections,
+        "skills": skills,
+        "prompt_resume": prompt_resume
+    }
+
+def start_resume_pipeline(state, file_key, resume_text):
+    """
+    Start preparing features for an uploaded resume in the background.
+
+    Args:
+        state: Session state mapping (st.session_state) the job is stored in
+        file_key (str): Identity of the uploaded file, e.g. a content hash
+        resume_text (str): Extracted resume text
+    """
+    job = state.get("resume_pipeline")
+    if job and job["file_key"] == file_key:
+        return
+
+    cancel_resume_pipeline(state)
+    cancel_event = threading.Event()
+    state["resume_pipeline"] = {
+        "file_key": file_key,
+        "cancel": cancel_event,
+        "future": _executor.submit(prepare_resume_features, resume_text, cancel_event)
+    }
+
+def cancel_resume_pipeline(state):
+    """Cancel the session's pending resume preparation, if any"""
+    job = state.get("resume_pipeline")
+    if job:
+        job["cancel"].set()
+        job["future"].cancel()
+        state["resume_pipeline"] = None
+
+def get_resume_features(state, timeout=None):
+    """
+    Return the prepared features for the session's current resume.
+
+    Args:
+        state: Session state mapping (st.session_state)
+        timeout (float): Seconds to wait if preparation is still running
+
+    Returns:
+        dict: Prepared features, or None if nothing was prepared or it failed
+    """
+    job = state.get("resume_pipeline")
+    if not job:
+        return None
+    try:
+        return job["future"].result(timeout=timeout)
+    except (CancelledError, PipelineCancelled):
+        return None
+    except Exception:
+        # Generation can still fall back to the raw resume text
+        return None
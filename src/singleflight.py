@@ -0,0 +1,117 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several sessions ask for the same thing at the same time, only the first
+caller runs the function; the others wait for it and receive the same result
+or exception.
+"""
+
+import hashlib
+import json
+import threading
+
+class _Call:
+    """State of one in-flight call shared by its waiters"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    Errors raised by the leading call are re-raised in every waiter. If the
+    leading call is cancelled (interrupted by a BaseException such as a
+    Streamlit rerun or KeyboardInterrupt), waiters are not cancelled with it:
+    one of them runs the call again instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executed = 0
+        self._saved = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Run fn once per key among concurrent callers and share its outcome.
+
+        Args:
+            key (str): Identity of the call, e.g. from make_key
+            fn (callable): Zero-argument function performing the call
+            timeout (float): Seconds a waiter waits for the leader before giving up
+
+        Returns:
+            object: The value returned by fn
+
+        Raises:
+            TimeoutError: If a waiter's timeout elapses first
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    self._calls[key] = call
+                    self._executed += 1
+
+            if leader:
+                return self._lead(key, call, fn)
+
+            if not call.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for an identical in-flight request")
+            if call.cancelled:
+                continue
+
+            with self._lock:
+                self._saved += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _lead(self, key, call, fn):
+        """Execute fn for a key and publish the outcome to waiters"""
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.cancelled = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        Report how many calls ran and how many were served by another caller's call.
+
+        Returns:
+            dict: Counts of executed, saved and currently in-flight calls
+        """
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "saved": self._saved,
+                "in_flight": len(self._calls)
+            }
+
+def make_key(**params):
+    """
+    Build a stable key from call parameters.
+
+    Args:
+        **params: JSON-serializable parameters identifying the call
+
+    Returns:
+        str: Hex digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
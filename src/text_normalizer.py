@@ -0,0 +1,264 @@
+"""
+Single-pass, streaming normalization of extracted resume text.
+
+Pages (or paragraphs) are consumed as they are extracted and pushed through a
+chain of generators, so every fixer sees each character or line once and the
+whole pipeline runs in time linear in the size of the document. The only
+buffering is headers_footers holding back the first EDGE_LOOKAHEAD_PAGES pages
+to learn running headers; most resumes fit in that window, so for them output
+starts once every page is extracted.
+
+Available fixers:
+    ligatures         Expand typographic ligatures such as "ﬁ" to "fi"
+    soft_hyphens      Remove soft hyphens, zero-width characters and odd spaces
+    headers_footers   Drop page numbers and lines repeated verbatim at the top or
+                      bottom of at least three pages
+    hyphenation       Rejoin words hyphenated across a line break, keeping the
+                      hyphen in compounds such as "self-motivated"
+    line_wraps        Rejoin sentences broken across lines: only when the previous
+                      line ends mid-sentence or fills most of the page width, and
+                      never onto a heading or between contact details and URLs
+
+hyphenation and line_wraps only suit text with hard line wraps (PDF pages); DOCX
+paragraphs are normalized without them.
+"""
+
+import os
+import re
+from collections import Counter
+from itertools import chain, islice
+
+DEFAULT_FIXERS = ("ligatures", "soft_hyphens", "headers_footers", "hyphenation", "line_wraps")
+
+_LIGATURES = {
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st"
+}
+
+_INVISIBLES = {
+    "\u00ad": "",   # soft hyphen
+    "\u200b": "",   # zero-width space
+    "\u200c": "",   # zero-width non-joiner
+    "\u200d": "",   # zero-width joiner
+    "\ufeff": "",   # byte order mark
+    "\u00a0": " ",  # no-break space
+    "\u2009": " ",  # thin space
+    "\u202f": " "   # narrow no-break space
+}
+
+# Number of lines at each end of a page checked for running headers and footers
+EDGE_LINES = 2
+
+# Leading pages held back to learn running headers and footers before the rest streams through
+EDGE_LOOKAHEAD_PAGES = 5
+
+# Pages besides the current one that must repeat a line at the same edge before it is dropped
+MIN_EDGE_REPEATS = 2
+
+# Fixers that rejoin broken lines; only meaningful for text with hard line wraps, such as PDFs
+LINE_BREAK_FIXERS = ("hyphenation", "line_wraps")
+
+# Page number lines, e.g. "Page 2 of 3", "- 2 -", "2/3"
+_PAGE_NUMBER = re.compile(r"^[-–\s]*(page\s*)?(\d+)(\s*(?:of|/)\s*\d+)?[-–\s]*$", re.IGNORECASE)
+
+# Words that form compounds with what follows, so a hyphen after them at a line end is kept
+_COMPOUND_PREFIXES = frozenset((
+    "self", "well", "high", "low", "long", "short", "full", "part", "cross", "non", "end", "real",
+    "hands", "fast", "detail", "results", "data", "customer", "client", "user", "team", "cost",
+    "time", "mission", "state", "world", "cutting", "large", "small", "mid", "top", "first",
+    "open", "award", "cloud", "test", "goal", "problem", "solution", "value", "year"
+))
+
+# Words a sentence cannot end on, so a line ending with one continues on the next
+_CONNECTIVES = frozenset((
+    "a", "an", "the", "and", "or", "of", "to", "in", "for", "with", "at", "by", "on", "from",
+    "as", "into", "across", "using", "including", "via", "per", "that", "which", "while"
+))
+
+# A wrapped line fills at least this share of the page's widest line
+WRAP_WIDTH_RATIO = 0.75
+
+# Pages whose widest line is shorter than this are lists, not wrapped prose
+MIN_WRAP_WIDTH = 40
+
+# Fragments that only ever complete a word split by hyphenation
+_SUFFIXES = frozenset(("ly", "ed", "er", "ing", "ness", "ful", "less", "ment", "ship", "able", "ible"))
+
+def get_configured_fixers():
+    """Return the fixers named in TEXT_NORMALIZATION_FIXERS, or the defaults"""
+    configured = os.getenv("TEXT_NORMALIZATION_FIXERS")
+    if configured is None:
+        return DEFAULT_FIXERS
+    return tuple(name.strip() for name in configured.split(",") if name.strip())
+
+def _build_translation(fixers):
+    """Combine the character-level fixers into one str.translate table"""
+    mapping = {}
+    if "ligatures" in fixers:
+        mapping.update(_LIGATURES)
+    if "soft_hyphens" in fixers:
+        mapping.update(_INVISIBLES)
+    return str.maketrans(mapping) if mapping else None
+
+def _page_lines(pages, table):
+    """Yield each page as a list of stripped lines; blank lines become empty strings"""
+    for page in pages:
+        if table is not None:
+            page = page.translate(table)
+        yield [line.strip() for line in page.splitlines()]
+
+def _is_page_number(line, number):
+    """Check whether a line is a page number, e.g. "Page 2 of 3", "2/3" or a bare number matching the page"""
+    match = _PAGE_NUMBER.match(line)
+    if not match:
+        return False
+    # A bare number is only a page number in its page's position, never a year or a count
+    return bool(match.group(1) or match.group(3)) or int(match.group(2)) == number
+
+def _edge_positions(lines):
+    """Return the positions of the first and last EDGE_LINES non-blank lines of a page"""
+    content = [position for position, line in enumerate(lines) if line]
+    return set(content[:EDGE_LINES]), set(content[-EDGE_LINES:])
+
+def _drop_running_edges(pages):
+    """
+    Drop page numbers and lines repeated verbatim at the same edge of several pages.
+
+    Running headers and footers are learned from the first EDGE_LOOKAHEAD_PAGES
+    pages, which are held back until then; later pages stream straight through.
+    """
+    pages = iter(pages)
+    window = list(islice(pages, EDGE_LOOKAHEAD_PAGES))
+    top_counts = Counter()
+    bottom_counts = Counter()
+    for lines in window:
+        top, bottom = _edge_positions(lines)
+        top_counts.update({lines[position] for position in top})
+        bottom_counts.update({lines[position] for position in bottom})
+    headers = {text for text, count in top_counts.items() if count > MIN_EDGE_REPEATS}
+    footers = {text for text, count in bottom_counts.items() if count > MIN_EDGE_REPEATS}
+
+    for number, lines in enumerate(chain(window, pages), start=1):
+        top, bottom = _edge_positions(lines)
+        kept = []
+        for position, line in enumerate(lines):
+            if position in top or position in bottom:
+                if _is_page_number(line, number):
+                    continue
+                if (position in top and line in headers) or (position in bottom and line in footers):
+                    continue
+            kept.append(line)
+        yield kept
+
+def _flatten(pages):
+    """Yield (line, page width) for the lines of every page in order"""
+    for lines in pages:
+        width = max(map(len, lines), default=0)
+        for line in lines:
+            yield line, width
+
+def _split_lines(chunks, table):
+    """Yield (line, None) for the stripped lines of chunks; there is no page width to compare with"""
+    for chunk in chunks:
+        if table is not None:
+            chunk = chunk.translate(table)
+        for line in chunk.splitlines():
+            yield line.strip(), None
+
+def _is_heading(line):
+    """Check whether a line looks like a short heading or name, which nothing is joined onto"""
+    if line.endswith(":"):
+        return True
+    words = line.split()
+    return len(words) <= 4 and all(word[0].isupper() or not word[0].isalpha() for word in words)
+
+def _is_contact(line):
+    """Check whether a line holds an email address, URL or path, which are never joined"""
+    return "@" in line or "/" in line or ".com" in line.lower()
+
+def _continues(previous, width):
+    """Check whether a line breaks off mid-sentence or is wrapped at the page width"""
+    if previous.endswith(","):
+        return True
+    if previous.rsplit(None, 1)[-1].lower() in _CONNECTIVES:
+        return True
+    return bool(width) and width >= MIN_WRAP_WIDTH and len(previous) >= WRAP_WIDTH_RATIO * width
+
+def _keeps_hyphen(tail, fragment):
+    """Check whether a hyphen at a line end belongs to a compound word rather than a split one"""
+    word = tail[:-1].rsplit(None, 1)[-1].lower()
+    following = re.match(r"[a-z]*", fragment).group()
+    if following in _SUFFIXES:
+        return False
+    # "state-of-" or "end-to-" are already compounds; otherwise rely on known prefixes
+    return "-" in word or word in _COMPOUND_PREFIXES
+
+def _join_breaks(lines, hyphenation, line_wraps):
+    """Rejoin words and sentences broken across lines and drop blank lines"""
+    # Collect the pieces of the current line and join once, to stay linear
+    parts = []
+    previous = ""
+    for line, width in lines:
+        if not line:
+            # A blank line ends a paragraph, so nothing is joined across it
+            if parts:
+                yield "".join(parts)
+            parts = []
+            continue
+        if (parts and line[0].islower() and not (len(parts) == 1 and _is_heading(parts[0]))
+                and not _is_contact(previous) and not _is_contact(line)):
+            tail = parts[-1]
+            if hyphenation and len(tail) > 1 and tail[-1] == "-" and tail[-2].isalpha():
+                if not _keeps_hyphen(tail, line):
+                    parts[-1] = tail[:-1]
+                parts.append(line)
+                previous = line
+                continue
+            if line_wraps and (tail[-1].isalpha() or tail[-1] == ",") and _continues(previous, width):
+                parts.append(" ")
+                parts.append(line)
+                previous = line
+                continue
+        if parts:
+            yield "".join(parts)
+        parts = [line]
+        previous = line
+    if parts:
+        yield "".join(parts)
+
+def normalize_lines(chunks, fixers=DEFAULT_FIXERS):
+    """
+    Normalize a stream of text without page structure, such as DOCX paragraphs.
+
+    Args:
+        chunks (iterable): Text chunks, each holding one or more lines
+        fixers (iterable): Names of the fixers to apply
+
+    Yields:
+        str: Normalized, non-empty lines
+    """
+    fixers = set(fixers)
+    lines = _split_lines(chunks, _build_translation(fixers))
+    return _join_breaks(lines, "hyphenation" in fixers, "line_wraps" in fixers)
+
+def normalize_pages(pages, fixers=DEFAULT_FIXERS):
+    """
+    Normalize a stream of page texts, such as PDF pages as they are extracted.
+
+    Args:
+        pages (iterable): Text of each page, in order
+        fixers (iterable): Names of the fixers to apply
+
+    Yields:
+        str: Normalized, non-empty lines
+    """
+    fixers = set(fixers)
+    page_lines = _page_lines(pages, _build_translation(fixers))
+    if "headers_footers" in fixers:
+        page_lines = _drop_running_edges(page_lines)
+    return _join_breaks(_flatten(page_lines), "hyphenation" in fixers, "line_wraps" in fixers)
@@ -0,0 +1,77 @@
+"""
+Sanitized session trace recorder for capacity testing.
+
+When TRAFFIC_RECORD_PATH is set, the production app appends one JSON line per
+user action: upload sizes and page counts, job description lengths, button
+clicks and downloads, and the think time between the end of the session's
+previous action and the start of this one. No resume or
+job description text, file names or raw user ids are ever written. Traces are
+replayed with benchmarks/replay_traffic.py.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_lock = threading.Lock()
+_last_seen = OrderedDict()
+
+# Sessions tracked for think-time calculation before the oldest is forgotten
+_MAX_TRACKED_SESSIONS = 10000
+
+def is_recording():
+    """Check whether traffic recording is enabled"""
+    return bool(os.getenv("TRAFFIC_RECORD_PATH"))
+
+def _session_id(user_id):
+    """Derive an opaque, stable session id so raw user ids never reach the trace"""
+    salt = os.getenv("TRAFFIC_RECORD_SALT", "")
+    return hashlib.sha256(f"{salt}:{user_id}".encode("utf-8")).hexdigest()[:12]
+
+def record_event(user_id, event, duration=0.0, **fields):
+    """
+    Append one sanitized event to the trace file, if recording is enabled.
+
+    Call it once the action has finished. The event is stamped with the
+    action's start time, and its duration is excluded from both its own think
+    time and the next one, so a replay that re-runs the action does not count
+    its latency twice.
+
+    Args:
+        user_id (str): Identifier returned by get_user_id
+        event (str): Event name ('session_start', 'upload', 'job_description' or 'click')
+        duration (float): Seconds the action itself took, e.g. parsing or generation
+        **fields: Numeric or short categorical details (sizes, counts, button names,
+            outcomes); never user content
+    """
+    path = os.getenv("TRAFFIC_RECORD_PATH")
+    if not path:
+        return
+
+    session = _session_id(user_id)
+    now = time.time()
+    started = now - duration
+    with _lock:
+        # _last_seen holds when the session's previous action finished
+        previous = _last_seen.pop(session, None)
+        _last_seen[session] = now
+        while len(_last_seen) > _MAX_TRACKED_SESSIONS:
+            _last_seen.popitem(last=False)
+
+        entry = {
+            "ts": round(started, 3),
+            "session": session,
+            "event": event,
+            "think_time": round(max(0.0, started - previous), 3) if previous is not None else 0.0,
+            "duration_ms": round(duration * 1000, 1)
+        }
+        entry.update(fields)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(json.dumps(entry) + "\n")
@@ -3,11 +3,49 @@ Utility functions for the Smart Resume & Cover Letter Generator.
 """
 
 import streamlit as st
+from src.feedback import record_feedback
+from src.traffic import record_event
 
+RESULT_HEADERS = {
+    "cover_letter": "📝 Generated Cover Letter",
+    "resume_bullets": "🎯 Enhanced Resume Bullets"
+}
+
+def store_result(result_type, content):
+    """
+    Keep a generated result in session state so it survives reruns.
+    
+    Args:
+        result_type (str): Type of result ('cover_letter' or 'resume_bullets')
+        content (str): Generated content
+    """
+    st.session_state.setdefault("results", {})[result_type] = content
+
+def reset_results_for(file_key):
+    """
+    Forget stored results when the resume they were generated for changes or is removed.
+    
+    Args:
+        file_key (str): Identity of the current upload, or None if there is none
+    """
+    if st.session_state.get("results_file_key") != file_key:
+        st.session_state["results_file_key"] = file_key
+        st.session_state.pop("results", None)
+
+def show_results():
+    """Display every result stored in session state"""
+    for result_type, content in st.session_state.get("results", {}).items():
+        st.header(RESULT_HEADERS.get(result_type, "Generated Content"))
+        display_results(result_type, content)
+
+@st.fragment
 def display_results(result_type, content):
     """
     Display AI-generated results with formatting and download options.
     
+    Runs as a fragment, so downloads and feedback clicks only rerun this panel
+    instead of the whole script.
+    
     Args:
         result_type (str): Type of result ('cover_letter' or 'resume_bullets')
         content (str): Generated content to display
@@ -26,26 +64,30 @@ def display_results(result_type, content):
         )
         
         # Download button
-        st.download_button(
+        if st.download_button(
             label="📥 Download Cover Letter",
             data=content,
             file_name="cover_letter.txt",
             mime="text/plain",
+            key=f"{result_type}_download",
             use_container_width=True
-        )
+        ):
+            record_event(st.session_state.get("user_id"), "click", button=f"{result_type}_download")
         
     elif result_type == "resume_bullets":
         st.markdown("### Enhanced Resume Bullet Points")
         st.markdown(content)
         
         # Download button
-        st.download_button(
+        if st.download_button(
             label="📥 Download Enhanced Bullets",
             data=content,
             file_name="enhanced_resume_bullets.txt",
             mime="text/plain",
+            key=f"{result_type}_download",
             use_container_width=True
-        )
+        ):
+            record_event(st.session_state.get("user_id"), "click", button=f"{result_type}_download")
     
     # Feedback section
     st.markdown("---")
@@ -54,15 +96,21 @@ def display_results(result_type, content):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.button("👍 Great!", use_container_width=True):
+        if st.button("👍 Great!", key=f"{result_type}_feedback_great", use_container_width=True):
+            record_feedback(result_type, "great", content, st.session_state.get("user_id"))
+            record_event(st.session_state.get("user_id"), "click", button=f"{result_type}_feedback_great")
             st.success("Thanks for the feedback!")
     
     with col2:
-        if st.button("👌 Good", use_container_width=True):
+        if st.button("👌 Good", key=f"{result_type}_feedback_good", use_container_width=True):
+            record_feedback(result_type, "good", content, st.session_state.get("user_id"))
+            record_event(st.session_state.get("user_id"), "click", button=f"{result_type}_feedback_good")
             st.info("Thanks! We'll keep improving.")
     
     with col3:
-        if st.button("👎 Needs Work", use_container_width=True):
+        if st.button("👎 Needs Work", key=f"{result_type}_feedback_needs_work", use_container_width=True):
+            record_feedback(result_type, "needs_work", content, st.session_state.get("user_id"))
+            record_event(st.session_state.get("user_id"), "click", button=f"{result_type}_feedback_needs_work")
             st.warning("Thanks for the feedback. Try regenerating or adjusting your inputs.")
 
 def format_text_for_download(content, file_type="txt"):
@@ -148,7 +196,7 @@ def show_about():
         
         **Privacy:**
         - Your data is processed securely
-        - Content is not stored permanently
+        - Generated results are kept in a local history for re-download and expire automatically
         - API calls are made directly to OpenAI
         
         **Tips:**